@@ -19,3 +19,7 @@ __download_url__ = "https://pypi.org/project/prepr"
 from .types import pstr
 from .models import CSHandler, Colorspace, settings
 from .main import prepr
+from .differ import diff
+from .printer import print
+from .paths import render_path, render_paths
+from .hasher import fingerprint
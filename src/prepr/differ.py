@@ -0,0 +1,160 @@
+from . import types, utils, models
+import typing
+
+
+_LEAF_TYPES = (str, int, float, bool, type(None))
+
+
+class _Differ:
+    """Walks two structures together, collecting a rendered line for each
+    changed path.
+
+    """
+    def __init__(self, exc: typing.Dict[int, str]) -> None:
+        self.exc = exc
+        self.seen: typing.Set[typing.Tuple[int, int]] = set()
+        self.lines: typing.List[str] = []
+
+
+    def _format(self, v) -> str:
+        return utils.format_value(v, self.exc, models.settings.indent,
+                                  models.settings.line_break)
+
+
+    def _line(self, marker: str, path: str, v) -> None:
+        self.lines.append(utils.concat(
+            marker, " ", path,
+            models.settings.csh.f_operator(models.settings.equals),
+            self._format(v)))
+
+
+    def removed(self, path: str, v) -> None:
+        self._line(models.settings.csh.f_error("-"), path, v)
+
+
+    def added(self, path: str, v) -> None:
+        self._line(models.settings.csh.f_class("+"), path, v)
+
+
+    def changed(self, path: str, old, new) -> None:
+        self.removed(path, old)
+        self.added(path, new)
+
+
+    def _equal(self, old, new) -> bool:
+        try:
+            return bool(old == new)
+        except Exception:
+            return False
+
+
+    def _mapping(self, old: dict, new: dict, path: str,
+                 segment: typing.Callable[[typing.Any], str]) -> None:
+        for k, v in old.items():
+            if k not in new:
+                self.removed(path + segment(k), v)
+            else:
+                self.walk(v, new[k], path + segment(k))
+        for k, v in new.items():
+            if k not in old:
+                self.added(path + segment(k), v)
+
+
+    def _sequence(self, old: typing.Sequence, new: typing.Sequence,
+                  path: str) -> None:
+        for index in range(min(len(old), len(new))):
+            self.walk(old[index], new[index],
+                      path + utils.format_index_path(index))
+        for index in range(len(new), len(old)):
+            self.removed(path + utils.format_index_path(index), old[index])
+        for index in range(len(old), len(new)):
+            self.added(path + utils.format_index_path(index), new[index])
+
+
+    def walk(self, old, new, path: str) -> None:
+        """Compare `old` and `new`, recursing into matching containers and
+        `prepr`-backed objects.
+
+        """
+        if old is new:
+            return
+        TYPE = type(old)
+        if TYPE != type(new):
+            old_prepr = utils.resolve_prepr(old)
+            new_prepr = utils.resolve_prepr(new)
+            if (old_prepr is None or new_prepr is None or
+                    type(old_prepr._inst) != type(new_prepr._inst)):
+                return self.changed(path, old, new)
+            return self._prepr(old_prepr, new_prepr, path)
+        if TYPE in _LEAF_TYPES:
+            if not self._equal(old, new):
+                self.changed(path, old, new)
+            return
+        if TYPE in [list, tuple, dict]:
+            key = (id(old), id(new))
+            if key in self.seen or self._equal(old, new):
+                return
+            self.seen.add(key)
+            if TYPE == dict:
+                return self._mapping(old, new, path, utils.format_index_path)
+            return self._sequence(old, new, path)
+        old_prepr = utils.resolve_prepr(old)
+        new_prepr = utils.resolve_prepr(new)
+        if old_prepr is not None and new_prepr is not None:
+            return self._prepr(old_prepr, new_prepr, path)
+        if not self._equal(old, new):
+            self.changed(path, old, new)
+
+
+    def _prepr(self, old: types.prepr, new: types.prepr, path: str) -> None:
+        """Compare the arguments, keyword arguments and attributes of two
+        `prepr` instances.
+
+        """
+        if old._exc or new._exc or type(old._inst) != type(new._inst):
+            return self.changed(path, old._inst, new._inst)
+        key = (id(old._inst), id(new._inst))
+        if key in self.seen:
+            return
+        self.seen.add(key)
+        self._sequence(old._args, new._args, path)
+        self._mapping(old._kwargs, new._kwargs, path,
+                      utils.format_attr_path)
+        self._mapping(old._attrs, new._attrs, path,
+                      utils.format_attr_path)
+
+
+def diff(old, new) -> str:
+    """Render only the differences between two objects.
+
+    Both structures are walked together; identical subtrees (by identity or
+    equality) are skipped, and each changed path is rendered as a `-` line for
+    the old value and a `+` line for the new value. Positional arguments of
+    `prepr`-backed objects are addressed as `[index]`, keyword arguments and
+    attributes as `.name`. An empty string is returned if nothing changed.
+
+    To see what an operation changed, `old` should be a `copy.deepcopy` of
+    the object taken beforehand. A `pstr` (e.g. from `repr(inst)`) may also be
+    passed, but it holds references to the values it was built from, so it
+    only records the root object's own argument, keyword argument and
+    attribute bindings; changes made inside those values are not reported.
+
+    Example usage
+    -------------
+    ```
+    before = copy.deepcopy(inst)
+    inst.e.c = "D"
+    print(prepr.diff(before, inst))
+    ```
+
+    """
+    root = utils.resolve_prepr(old) or utils.resolve_prepr(new)
+    if root is not None and not root._exc:
+        differ = _Differ({id(root._inst): root._variable})
+        path = root._variable
+    else:
+        differ = _Differ({})
+        path = models.settings.csh.f_variable(
+            "__" + type(old).__name__.lower() + "__")
+    differ.walk(old, new, path)
+    return "\n".join(differ.lines)
@@ -0,0 +1,162 @@
+from . import types, utils
+import collections
+import hashlib
+import inspect
+import typing
+import enum
+import types as builtin_types
+
+
+class _Hasher:
+    """Feeds a structural description of a value into a streaming hash,
+    following the same type dispatch as `utils.format_value`.
+
+    """
+    def __init__(self, digest_size: int) -> None:
+        self.hash = hashlib.blake2b(digest_size=digest_size)
+        self.active: typing.Dict[int, int] = {}
+
+
+    def token(self, tag: bytes, text: str = "") -> None:
+        """Feed a length-prefixed `tag` and `text` pair.
+
+        """
+        data = text.encode("utf-8", "surrogatepass")
+        self.hash.update(tag + len(data).to_bytes(8, "little") + data)
+
+
+    def _items(self, tag: bytes, name: str, v: typing.Iterable) -> None:
+        self.token(tag, name)
+        for V in v:
+            self.feed(V)
+        self.token(b")")
+
+
+    def _pairs(self, tag: bytes, name: str,
+               v: typing.Iterable[typing.Tuple]) -> None:
+        self.token(tag, name)
+        for k, V in v:
+            self.feed(k)
+            self.feed(V)
+        self.token(b")")
+
+
+    def _unordered(self, name: str, v: typing.Iterable) -> None:
+        """Feed the items of a set in an order-independent way by hashing each
+        item separately and sorting the digests.
+
+        """
+        digests = []
+        for V in v:
+            item = _Hasher(self.hash.digest_size)
+            item.active = self.active
+            item.feed(V)
+            digests.append(item.hash.hexdigest())
+        self.token(b"S", name)
+        for digest in sorted(digests):
+            self.token(b"h", digest)
+        self.token(b")")
+
+
+    def _enter(self, v) -> bool:
+        """Mark `v` as being fed, feeding a back-reference instead (and
+        returning False) if it is already an ancestor.
+
+        """
+        if id(v) in self.active:
+            self.token(b"@", str(self.active[id(v)]))
+            return False
+        self.active[id(v)] = len(self.active)
+        return True
+
+
+    def _prepr(self, v: types.prepr) -> None:
+        if v._exc:
+            self.token(b"!", utils.qualname(type(v._inst)))
+            return
+        if not self._enter(v._inst):
+            return
+        self.token(b"P", utils.qualname(type(v._inst)))
+        self.token(b"#", v._note_text)
+        self._items(b"a", "", v._args)
+        self._pairs(b"k", "", v._kwargs.items())
+        self._pairs(b"t", "", v._attrs.items())
+        self.token(b")")
+        del self.active[id(v._inst)]
+
+
+    def feed(self, v) -> None:
+        """Feed a value of any type.
+
+        """
+        TYPE = type(v)
+        if TYPE == str:
+            return self.token(b"s", v)
+        if TYPE in [int, float]:
+            return self.token(b"n", repr(v))
+        if TYPE == bool or v is None:
+            return self.token(b"b", repr(v))
+        if TYPE in [list, tuple, dict, set, frozenset, collections.deque,
+                    collections.OrderedDict, collections.defaultdict]:
+            if not self._enter(v):
+                return
+            if TYPE in [set, frozenset]:
+                self._unordered(TYPE.__name__, v)
+            elif TYPE in [dict, collections.OrderedDict,
+                          collections.defaultdict]:
+                self._pairs(b"d", TYPE.__name__, v.items())
+            else:
+                self._items(b"l", TYPE.__name__, v)
+            del self.active[id(v)]
+            return
+        if TYPE in utils.DICT_VIEW_TYPES:
+            return self._items(b"l", TYPE.__name__, v)
+        if TYPE == range:
+            return self.token(b"r", repr(v))
+        if inspect.isclass(v):
+            return self.token(b"c", utils.qualname(v))
+        if TYPE in [builtin_types.FunctionType,
+                    builtin_types.BuiltinFunctionType,
+                    builtin_types.BuiltinMethodType]:
+            return self.token(b"f", utils.qualname(v))
+        if isinstance(v, enum.Enum):
+            return self.token(b"e", utils.qualname(TYPE) + "." + v.name)
+        _prepr = utils.resolve_prepr(v)
+        if _prepr is not None:
+            return self._prepr(_prepr)
+        if isinstance(v, utils.ITERATOR_TYPES) or (
+                TYPE.__module__ == "builtins" and
+                isinstance(v, typing.Iterator)):
+            return self.token(b"i", utils.qualname(TYPE))
+        if not utils.may_stringify(v):
+            return self.token(b"o", utils.qualname(TYPE))
+        try:
+            text = "%s" % (v,)
+        except Exception:
+            text = "!!!"
+        self.token(b"o", utils.qualname(TYPE))
+        self.token(b"o", text)
+
+
+def fingerprint(obj, digest_size: int = 16) -> str:
+    """Return a hex digest describing the structure and values of `obj`
+    without rendering it.
+
+    The digest is independent of the colorspace and the layout settings; it
+    only changes when the notes, arguments, keyword arguments, attributes or
+    values reached from `obj` change. Objects that may not be stringified
+    (see `settings.str_denylist` and `settings.str_allowlist`) are hashed by
+    type only, so changing those settings can change the digest. Cyclic
+    references are hashed as back-references to their ancestor.
+
+    Example usage
+    -------------
+    ```
+    if prepr.fingerprint(inst) != last_fingerprint:
+        print(inst)
+    ```
+
+    """
+    hasher = _Hasher(digest_size)
+    hasher.feed(obj)
+    return hasher.hash.hexdigest()
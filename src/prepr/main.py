@@ -44,6 +44,7 @@ class prepr(types.prepr):
                 or "__" + type(inst).__name__.lower() + "__")
             self._note: str = models.settings.csh.f_comment(
                 models.settings.comment + note if note else "")
+            self._note_text: str = note or ""
             self._name: str = models.settings.csh.f_class(type(inst).__name__)
             self._args: list[str] = []
             self._kwargs: dict[str, str] = {}
@@ -212,7 +213,7 @@ class prepr(types.prepr):
         """Return `<name>(...)`.
         
         """
-        return (
+        return models.pstr(
             utils.concat(
                 self._name,
                 models.settings.csh.f_bracket("("),
@@ -257,8 +258,13 @@ class prepr(types.prepr):
             A value used internally to resolve issues with recursion. Should not
             be defined by the user.
 
+        If `settings.time_budget` is set, any value reached after the budget
+        is spent is rendered as `<type>(...)` instead.
+
         """
         if not self._exc:
+            # nested builds share the deadline of the outermost build
+            deadline = utils.start_deadline()
             try:
                 if return_prepr:
                     return self
@@ -299,5 +305,7 @@ class prepr(types.prepr):
                 )
             except Exception as exc:
                 self._exc = exc
+            finally:
+                utils.end_deadline(deadline)
         return models.pstr("\033[32mPreprBuildFailure\033[33m(\033[31m\"" +
                            str(self._exc) + "\"\033[33m)\033[0m", self)
@@ -1,5 +1,12 @@
 from . import types
 import dataclasses
+import contextvars
+
+
+# a colorspace used by every `CSHandler` in the current context (thread or
+# asyncio task) instead of its own, e.g. while `prepr.print` renders
+colorspace_override: "contextvars.ContextVar[types.Colorspace]" = (
+    contextvars.ContextVar("prepr_colorspace", default=None))
 
 
 class CSHandler:
@@ -9,6 +16,13 @@ class CSHandler:
     """
     def __init__(self, cs: types.Colorspace) -> None:
         self.cs = cs
+    @property
+    def cs(self) -> types.Colorspace:
+        override = colorspace_override.get()
+        return self._cs if override is None else override
+    @cs.setter
+    def cs(self, cs: types.Colorspace) -> None:
+        self._cs = cs
     def f_function(self, __text) -> str:
         return self.cs.c_function + __text + self.cs.c_reset
     def f_class(self, __text) -> str:
@@ -161,6 +175,12 @@ class settings:
     force_tuples_collapsed: bool = False
     force_dicts_collapsed: bool = False
     force_sub_preprs_collapsed: bool = False
+    max_items: int = 100
+    compress_runs: int = None
+    tabulate: int = None
+    time_budget: float = None
+    str_denylist: tuple = ()
+    str_allowlist: tuple = None
     @staticmethod
     def default() -> None:
         settings.indent = "    "
@@ -174,6 +194,12 @@ class settings:
         settings.force_tuples_collapsed = False
         settings.force_dicts_collapsed = False
         settings.force_sub_preprs_collapsed= False
+        settings.max_items = 100
+        settings.compress_runs = None
+        settings.tabulate = None
+        settings.time_budget = None
+        settings.str_denylist = ()
+        settings.str_allowlist = None
     @staticmethod
     def minimal() -> None:
         settings.indent = ""
@@ -199,7 +225,13 @@ class settings:
         force_lists_collapsed: bool = types.MISSING,
         force_tuples_collapsed: bool = types.MISSING,
         force_dicts_collapsed: bool = types.MISSING,
-        force_sub_preprs_collapsed: bool = types.MISSING
+        force_sub_preprs_collapsed: bool = types.MISSING,
+        max_items: int = types.MISSING,
+        compress_runs: int = types.MISSING,
+        tabulate: int = types.MISSING,
+        time_budget: float = types.MISSING,
+        str_denylist: tuple = types.MISSING,
+        str_allowlist: tuple = types.MISSING
     ):
         """Batch-update settings.
         
@@ -216,7 +248,13 @@ class settings:
             ("force_lists_collapsed", force_lists_collapsed),
             ("force_tuples_collapsed", force_tuples_collapsed),
             ("force_dicts_collapsed", force_dicts_collapsed),
-            ("force_sub_preprs_collapsed", force_sub_preprs_collapsed)
+            ("force_sub_preprs_collapsed", force_sub_preprs_collapsed),
+            ("max_items", max_items),
+            ("compress_runs", compress_runs),
+            ("tabulate", tabulate),
+            ("time_budget", time_budget),
+            ("str_denylist", str_denylist),
+            ("str_allowlist", str_allowlist)
         ]
         for name, value in pairs:
             if value != types.MISSING:
@@ -0,0 +1,114 @@
+from . import utils, models
+import typing
+import ast
+import re
+
+
+_SEGMENT = re.compile(r"""
+    \.?(?P<name>[A-Za-z_]\w*)
+    | \[(?P<key>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[^\]]*)\]
+""", re.VERBOSE)
+
+
+def parse_path(path: str) -> typing.List[typing.Tuple[str, typing.Any]]:
+    """Split a path such as `e.a[2]["key"]` into `("name", "e")`,
+    `("name", "a")`, `("key", 2)` and `("key", "key")` segments. Bracketed
+    keys must be Python literals.
+
+    """
+    segments = []
+    position = 0
+    while position < len(path):
+        match = _SEGMENT.match(path, position)
+        if not match or (match.group("name") and position and
+                         path[position] != "."):
+            raise ValueError(f"invalid path {path!r} at position {position}")
+        if match.group("name"):
+            segments.append(("name", match.group("name")))
+        else:
+            try:
+                segments.append(("key", ast.literal_eval(match.group("key"))))
+            except (ValueError, SyntaxError):
+                raise ValueError(f"invalid key {match.group('key')!r} in path "
+                                 f"{path!r}") from None
+        position = match.end()
+    return segments
+
+
+def _step(v, kind: str, key, exc: typing.Dict[int, str]):
+    """Return the value reached from `v` by one path segment. Positional
+    arguments of `prepr`-backed objects are reached with an `int` key, keyword
+    arguments and attributes with a name (or `str` key).
+
+    """
+    _prepr = utils.resolve_prepr(v)
+    if _prepr is not None and not _prepr._exc:
+        exc[id(_prepr._inst)] = _prepr._variable
+        if type(key) == int:
+            return _prepr._args[key]
+        if key in _prepr._kwargs:
+            return _prepr._kwargs[key]
+        if key in _prepr._attrs:
+            return _prepr._attrs[key]
+        raise KeyError(key)
+    if kind == "name":
+        return getattr(v, key)
+    return v[key]
+
+
+def _render(obj, path: str, exc: typing.Dict[int, str]) -> str:
+    """Render the value at `path` in `obj`, prefixed with its full path.
+
+    """
+    root = utils.resolve_prepr(obj)
+    if root is not None and not root._exc:
+        prefix = root._variable
+    else:
+        prefix = models.settings.csh.f_variable(
+            "__" + type(obj).__name__.lower() + "__")
+    v = obj
+    for kind, key in parse_path(path):
+        v = _step(v, kind, key, exc)
+        prefix += (utils.format_attr_path(key) if kind == "name" else
+                   utils.format_index_path(key))
+    _prepr = utils.resolve_prepr(v)
+    if _prepr is not None and not _prepr._exc:
+        # render the selected object itself rather than its cycle label
+        exc[id(_prepr._inst)] = _prepr._variable
+        formatted = _prepr._build_simple(exc, models.settings.indent,
+                                         models.settings.line_break)
+    else:
+        formatted = utils.format_value(v, exc, models.settings.indent,
+                                       models.settings.line_break)
+    return utils.concat(prefix,
+                        models.settings.csh.f_operator(models.settings.equals),
+                        formatted)
+
+
+def render_path(obj, path: str) -> str:
+    """Render only the value at `path` within `obj`, without formatting
+    anything outside of it.
+
+    `path` uses the same notation as `diff`: `.name` (or a leading `name`)
+    selects a keyword argument or attribute, `[index]` selects a positional
+    argument or list/tuple item, and `[key]` selects a dict item. Objects
+    that are not `prepr`-backed are navigated with `getattr` and indexing.
+    Raises `ValueError` for a malformed path, and `KeyError`, `IndexError` or
+    `AttributeError` if the path does not exist.
+
+    Example usage
+    -------------
+    ```
+    print(prepr.render_path(inst, "e.a[2]"))
+    ```
+
+    """
+    return _render(obj, path, {})
+
+
+def render_paths(obj, *paths: str) -> str:
+    """Render the values at each of `paths` within `obj` (see `render_path`),
+    one per line.
+
+    """
+    return "\n".join([_render(obj, path, {}) for path in paths])
@@ -0,0 +1,92 @@
+from . import types, utils, models
+import typing
+import sys
+import os
+
+
+_colorspaces: typing.Dict[int, types.Colorspace] = {}
+
+
+def detect_colorspace(file: typing.TextIO) -> types.Colorspace:
+    """Choose the richest colorspace supported by `file`, based on whether it
+    is a terminal and on the `NO_COLOR`, `COLORTERM` and `TERM` environment
+    variables.
+
+    """
+    if os.environ.get("NO_COLOR"):
+        return models.Colorspace.none
+    try:
+        if not file.isatty():
+            return models.Colorspace.none
+    except Exception:
+        return models.Colorspace.none
+    term = os.environ.get("TERM", "")
+    if term == "dumb":
+        return models.Colorspace.none
+    if os.environ.get("COLORTERM", "").lower() in ["truecolor", "24bit"]:
+        return models.Colorspace.rgbfull
+    if "256color" in term:
+        return models.Colorspace.rgb256
+    return models.Colorspace.rgb8
+
+
+def get_colorspace(file: typing.TextIO) -> types.Colorspace:
+    """Return the colorspace detected for `file`. The result is cached per
+    file descriptor.
+
+    """
+    try:
+        fd = file.fileno()
+    except Exception:
+        return detect_colorspace(file)
+    if fd not in _colorspaces:
+        _colorspaces[fd] = detect_colorspace(file)
+    return _colorspaces[fd]
+
+
+def _render(v, cs: types.Colorspace) -> str:
+    """Render a single object the way `print` would. `pstr` instances have
+    already been built, so they are printed as they are, with any terminal
+    formatting codes removed if `cs` is `Colorspace.none`.
+
+    """
+    if isinstance(v, types.pstr):
+        if cs is models.Colorspace.none:
+            return utils.ANSI_ESCAPE.sub("", v)
+        return str.__str__(v)
+    return utils.attempt_str(v)
+
+
+def print(*objs, sep: typing.Optional[str] = " ",
+          end: typing.Optional[str] = "\n", file: typing.TextIO = None,
+          flush: bool = False) -> None:
+    """Print any number of objects to `file` (defaulting to `sys.stdout`)
+    with a single write.
+
+    The colorspace is chosen automatically for the stream (see
+    `detect_colorspace`) and is only used by the current thread (or asyncio
+    task) for the duration of the call; the global `settings.csh` is left
+    unchanged. Already built `pstr` instances (e.g. from `repr(inst)`) keep
+    their own text and colors, which are only stripped if the stream does not
+    support color. As with the built-in `print`, a `sep` or `end` of None
+    means the default.
+
+    Example usage
+    -------------
+    ```
+    prepr.print(inst_a, inst_b, sep="\\n", file=sys.stderr)
+    ```
+
+    """
+    file = sys.stdout if file is None else file
+    sep = " " if sep is None else sep
+    end = "\n" if end is None else end
+    cs = get_colorspace(file)
+    token = models.colorspace_override.set(cs)
+    try:
+        text = sep.join([_render(v, cs) for v in objs]) + end
+    finally:
+        models.colorspace_override.reset(token)
+    file.write(text)
+    if flush:
+        file.flush()
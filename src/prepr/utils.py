@@ -4,6 +4,62 @@ import inspect
 import enum
 import typing
 import types as builtin_types
+import collections
+import itertools
+import re
+import time
+import contextvars
+
+
+DICT_VIEW_TYPES = (type({}.keys()), type({}.values()), type({}.items()))
+ITERATOR_TYPES = (builtin_types.GeneratorType, builtin_types.AsyncGeneratorType,
+                  builtin_types.CoroutineType)
+ANSI_ESCAPE = re.compile(r"\033\[[0-9;]*m")
+
+
+# a context variable, so that each thread (and asyncio task) has its own
+# deadline
+_deadline: "contextvars.ContextVar[typing.Optional[float]]" = (
+    contextvars.ContextVar("prepr_deadline", default=None))
+
+
+def start_deadline() -> typing.Optional[contextvars.Token]:
+    """Start the deadline for the current build from `settings.time_budget`,
+    unless a deadline is already running in this context (i.e. for nested
+    builds). Return a token which should be passed to `end_deadline`.
+    
+    """
+    if _deadline.get() is None and models.settings.time_budget is not None:
+        return _deadline.set(time.perf_counter() +
+                             models.settings.time_budget)
+    return None
+
+
+def end_deadline(token: typing.Optional[contextvars.Token]) -> None:
+    """End the deadline started by `start_deadline`, if any.
+    
+    """
+    if token is not None:
+        _deadline.reset(token)
+
+
+def deadline_passed() -> bool:
+    """Return True if the deadline of the current build has passed.
+    
+    """
+    deadline = _deadline.get()
+    return deadline is not None and time.perf_counter() > deadline
+
+
+def may_stringify(v) -> bool:
+    """Return True if `v.__repr__`/`v.__str__` may be called, according to
+    `settings.str_denylist` and `settings.str_allowlist`.
+    
+    """
+    if isinstance(v, tuple(models.settings.str_denylist)):
+        return False
+    return (models.settings.str_allowlist is None or
+            isinstance(v, tuple(models.settings.str_allowlist)))
 
 
 def concat(*__text: str) -> str:
@@ -19,7 +75,9 @@ def attempt_str(value) -> str:
 
     """
     try:
-        return str(value)
+        # `str(value)` would call `pstr.__init__` without a `_prepr` if
+        # `value.__str__` returns a `pstr`, so format it instead
+        return "%s" % (value,)
     except Exception:
         return concat(
             models.settings.csh.f_operator(".").join(
@@ -30,6 +88,14 @@ def attempt_str(value) -> str:
             models.settings.csh.f_bracket(")"))
 
 
+def qualname(v) -> str:
+    """Return the uncoloured `module.qualname` of a class or function.
+    
+    """
+    return concat(getattr(v, "__module__", None) or "", ".",
+                  getattr(v, "__qualname__", None) or type(v).__qualname__)
+
+
 def indent(__str: str, __indent: str) -> str:
     """Increases the indent of each line in `__str` by `__indent`.
     
@@ -56,13 +122,176 @@ def format_bool_none(v: typing.Union[bool, None]) -> str:
     """
     return models.settings.csh.f_boolean(attempt_str(v))
 
+SCALAR_TYPES = [str, int, float, bool]
+
+def is_homogeneous(v: typing.Sequence) -> bool:
+    """Return True if `v` has more than one item and all of its items are
+    scalars (strings, numbers or booleans) of the same type.
+    
+    """
+    if len(v) < 2 or type(v[0]) not in SCALAR_TYPES:
+        return False
+    TYPE = type(v[0])
+    return all(type(V) == TYPE for V in v)
+
+def find_runs(v: typing.Sequence, exc: typing.Dict[int, str], i: str,
+              lb: str) -> typing.List[list]:
+    """Format each item of `v` once, grouping adjacent items that are
+    rendered identically into `[text, count]` runs. An item is not formatted
+    at all if it is the previous item, or an equal `str`, `int` or `bool`.
+    
+    """
+    runs = []
+    for n, V in enumerate(v):
+        if runs:
+            previous = v[n - 1]
+            if V is previous or (type(V) == type(previous) and
+                                 type(V) in [str, int, bool] and
+                                 V == previous):
+                runs[-1][1] += 1
+                continue
+        text = format_value(V, exc, i, lb)
+        if runs and runs[-1][0] == text:
+            runs[-1][1] += 1
+        else:
+            runs.append([text, 1])
+    return runs
+
+def is_compressible(count: int) -> bool:
+    """Return True if a run of `count` items should be compressed.
+    
+    """
+    return count > 1 and count >= models.settings.compress_runs
+
+def format_repeat(formatted: str, count: int, opening: str, closing: str,
+                  trailing_comma: bool = False) -> str:
+    """Format `[value] * count` given an already formatted value.
+    
+    """
+    return concat(
+        models.settings.csh.f_bracket(opening),
+        formatted,
+        (models.settings.csh.f_operator(models.settings.comma.strip())
+         if trailing_comma else ""),
+        models.settings.csh.f_bracket(closing),
+        models.settings.csh.f_operator(" * "),
+        format_num(count)
+    )
+
+def format_runs(runs: typing.List[list], opening: str,
+                closing: str) -> typing.List[str]:
+    """Expand the runs found by `find_runs` into formatted items, rendering
+    compressible runs as `*[value] * count`.
+    
+    """
+    values = []
+    for text, count in runs:
+        if is_compressible(count):
+            values.append(concat(models.settings.csh.f_operator("*"),
+                format_repeat(text, count, opening, closing,
+                              opening == "(")))
+        else:
+            values.extend([text] * count)
+    return values
+
+def visible_len(__str: str) -> int:
+    """Return the length of `__str` without any terminal formatting codes.
+    
+    """
+    return len(ANSI_ESCAPE.sub("", __str))
+
+def table_schema(v: typing.Sequence, exc: typing.Dict[int, str]
+                 ) -> typing.Optional[typing.Tuple[typing.List[types.prepr],
+                 int, typing.List[str], typing.List[str]]]:
+    """Return the `prepr` instances of each item in `v`, along with the
+    largest number of positional arguments and the keyword argument and
+    attribute names used by any item (in order of first appearance), if `v`
+    can be rendered as a table. Otherwise, return None.
+    
+    """
+    if not v or len(v) < models.settings.tabulate:
+        return None
+    preprs = []
+    nargs = 0
+    kwargs = {}
+    attrs = {}
+    for V in v:
+        _prepr = resolve_prepr(V)
+        if (_prepr is None or _prepr._exc or id(_prepr._inst) in exc or
+                (preprs and type(_prepr._inst) != type(preprs[0]._inst))):
+            return None
+        preprs.append(_prepr)
+        nargs = max(nargs, len(_prepr._args))
+        kwargs.update(dict.fromkeys(_prepr._kwargs))
+        attrs.update(dict.fromkeys(_prepr._attrs))
+    return preprs, nargs, list(kwargs), list(attrs)
+
+def format_table(v: typing.Sequence, exc: typing.Dict[int, str], i: str,
+                 lb: str, opening: str, closing: str) -> typing.Optional[str]:
+    """Format a list or tuple of `prepr`-backed objects of the same class as
+    an aligned table with one row per item and one column per positional
+    argument, keyword argument and attribute. The class name and column names
+    are only formatted once, in the header; the notes of each item are not
+    shown. Return None if `v` cannot be rendered as a table, including if any
+    cell spans more than one line.
+    
+    """
+    if models.settings.tabulate is None or "\n" not in lb:
+        return None
+    schema = table_schema(v, exc)
+    if schema is None:
+        return None
+    preprs, nargs, kwargs, attrs = schema
+    columns = [[preprs[0]._name] + [format_num(n) for n in range(len(v))]]
+    for n in range(nargs):
+        columns.append([format_index_path(n)] + [
+            format_value(_prepr._args[n], exc, "", "")
+            if n < len(_prepr._args) else "" for _prepr in preprs])
+    for k in kwargs:
+        columns.append([models.settings.csh.f_argument(k)] + [
+            format_value(_prepr._kwargs[k], exc, "", "")
+            if k in _prepr._kwargs else "" for _prepr in preprs])
+    for k in attrs:
+        columns.append([format_attr_path(k)] + [
+            format_value(_prepr._attrs[k], exc, "", "")
+            if k in _prepr._attrs else "" for _prepr in preprs])
+    if any("\n" in cell for column in columns for cell in column):
+        return None
+    widths = [max([visible_len(cell) for cell in column]) for column in columns]
+    separator = models.settings.csh.f_operator(" | ")
+    rows = []
+    for row in zip(*columns):
+        rows.append(separator.join([concat(cell, " " * (width -
+            visible_len(cell))) for cell, width in zip(row, widths)]).rstrip())
+    rows.insert(1, models.settings.csh.f_comment("-+-".join(
+        ["-" * width for width in widths])))
+    return concat(
+        models.settings.csh.f_bracket(opening),
+        indent(concat(lb, lb.join(rows)), i),
+        lb,
+        models.settings.csh.f_bracket(closing)
+    )
+
 def format_list(v: list, exc: typing.Dict[int, str], i: str, lb: str) -> str:
     """Format a list value.
     
     """
     I = "" if models.settings.force_lists_collapsed else i
     LB = "" if models.settings.force_lists_collapsed else lb
-    values = [concat(LB, format_value(V, exc, I, LB)) for V in v]
+    table = format_table(v, exc, I, LB, "[", "]")
+    if table is not None:
+        return table
+    if models.settings.compress_runs is not None:
+        if is_homogeneous(v):
+            # lay out sequences of same-type scalars on a single line
+            I = LB = ""
+        runs = find_runs(v, exc, I, LB)
+        if len(runs) == 1 and is_compressible(runs[0][1]):
+            return format_repeat(runs[0][0], runs[0][1], "[", "]")
+        values = format_runs(runs, "[", "]")
+    else:
+        values = [format_value(V, exc, I, LB) for V in v]
+    values = [concat(LB, V) for V in values]
     return concat(
         models.settings.csh.f_bracket("["),
         indent(
@@ -79,7 +308,20 @@ def format_tuple(v: tuple, exc: typing.Dict[int, str], i: str, lb: str) -> str:
     """
     I = "" if models.settings.force_tuples_collapsed else i
     LB = "" if models.settings.force_tuples_collapsed else lb
-    values = [concat(LB, format_value(V, exc, I, LB)) for V in v]
+    table = format_table(v, exc, I, LB, "(", ")")
+    if table is not None:
+        return table
+    if models.settings.compress_runs is not None:
+        if is_homogeneous(v):
+            # lay out sequences of same-type scalars on a single line
+            I = LB = ""
+        runs = find_runs(v, exc, I, LB)
+        if len(runs) == 1 and is_compressible(runs[0][1]):
+            return format_repeat(runs[0][0], runs[0][1], "(", ")", True)
+        values = format_runs(runs, "(", ")")
+    else:
+        values = [format_value(V, exc, I, LB) for V in v]
+    values = [concat(LB, V) for V in values]
     return concat(
         models.settings.csh.f_bracket("("),
         indent(
@@ -147,6 +389,158 @@ def format_enum(v: enum.Enum) -> str:
         models.settings.csh.f_operator("."),
         models.settings.csh.f_enum(values[-1]))
 
+def take_items(v: typing.Iterable) -> typing.Tuple[list, typing.Optional[int]]:
+    """Consume at most `settings.max_items` items from `v` (none if it is
+    negative), returning them and the number of items left over (None if
+    `len(v)` is unavailable).
+    
+    """
+    limit = models.settings.max_items
+    items = (list(v) if limit is None else
+             list(itertools.islice(v, max(limit, 0))))
+    try:
+        remaining = len(v) - len(items)
+    except Exception:
+        remaining = None
+    return items, remaining
+
+def format_elision(remaining: typing.Optional[int], lb: str) -> str:
+    """Format the `...` placeholder for items that were not rendered.
+    
+    """
+    if remaining is None:
+        return models.settings.csh.f_operator("...")
+    if "\n" in lb:
+        return concat(models.settings.csh.f_operator("..."),
+            models.settings.csh.f_comment(models.settings.comment +
+            str(remaining) + " more"))
+    return concat(models.settings.csh.f_operator("..."),
+        models.settings.csh.f_comment("(" + str(remaining) + " more)"))
+
+def format_items(values: typing.List[str], remaining: typing.Optional[int],
+                 opening: str, closing: str, i: str, lb: str) -> str:
+    """Join already formatted `values` between `opening` and `closing`
+    brackets, adding an elision if `remaining` is not 0.
+    
+    """
+    values = [concat(lb, V) for V in values]
+    if remaining != 0:
+        values.append(concat(lb, format_elision(remaining, lb)))
+    return concat(
+        models.settings.csh.f_bracket(opening),
+        indent(
+            models.settings.csh.f_operator(models.settings.comma).join(values),
+            i
+        ),
+        lb if values else "",
+        models.settings.csh.f_bracket(closing)
+    )
+
+def format_call(name: str, *formatted_args: str) -> str:
+    """Format `name(arg, ...)` where each argument is already formatted.
+    
+    """
+    return concat(
+        models.settings.csh.f_class(name),
+        models.settings.csh.f_bracket("("),
+        models.settings.csh.f_operator(models.settings.comma).join(
+            formatted_args),
+        models.settings.csh.f_bracket(")")
+    )
+
+def format_set(v: typing.Union[set, frozenset], exc: typing.Dict[int, str],
+               i: str, lb: str) -> str:
+    """Format a set or frozenset value, rendering at most
+    `settings.max_items` items.
+    
+    """
+    I = "" if models.settings.force_lists_collapsed else i
+    LB = "" if models.settings.force_lists_collapsed else lb
+    if not v:
+        return format_call(type(v).__name__)
+    items, remaining = take_items(v)
+    formatted = format_items([format_value(V, exc, I, LB) for V in items],
+                             remaining, "{", "}", I, LB)
+    if type(v) == set:
+        return formatted
+    return format_call(type(v).__name__, formatted)
+
+def format_deque(v: collections.deque, exc: typing.Dict[int, str], i: str,
+                 lb: str) -> str:
+    """Format a `collections.deque` value, rendering at most
+    `settings.max_items` items.
+    
+    """
+    I = "" if models.settings.force_lists_collapsed else i
+    LB = "" if models.settings.force_lists_collapsed else lb
+    items, remaining = take_items(v)
+    formatted = format_items([format_value(V, exc, I, LB) for V in items],
+                             remaining, "[", "]", I, LB)
+    if v.maxlen is None:
+        return format_call("deque", formatted)
+    return format_call("deque", formatted, concat(
+        models.settings.csh.f_argument("maxlen"),
+        models.settings.csh.f_operator(models.settings.equals.strip()),
+        format_num(v.maxlen)))
+
+def format_dict_view(v: typing.Union[typing.KeysView, typing.ValuesView,
+                     typing.ItemsView], exc: typing.Dict[int, str], i: str,
+                     lb: str) -> str:
+    """Format a `dict_keys`, `dict_values` or `dict_items` value, rendering at
+    most `settings.max_items` items.
+    
+    """
+    I = "" if models.settings.force_lists_collapsed else i
+    LB = "" if models.settings.force_lists_collapsed else lb
+    items, remaining = take_items(v)
+    return format_call(type(v).__name__, format_items(
+        [format_value(V, exc, I, LB) for V in items], remaining, "[", "]", I,
+        LB))
+
+def format_mapping(v: dict, exc: typing.Dict[int, str], i: str,
+                   lb: str) -> str:
+    """Format a `collections.OrderedDict` or `collections.defaultdict` value,
+    rendering at most `settings.max_items` items.
+    
+    """
+    I = "" if models.settings.force_dicts_collapsed else i
+    LB = "" if models.settings.force_dicts_collapsed else lb
+    items, remaining = take_items(v.items())
+    formatted = format_items([concat(format_value(k, exc, I, LB),
+        models.settings.csh.f_operator(models.settings.colon),
+        format_value(V, exc, I, LB)) for k, V in items], remaining, "{", "}",
+        I, LB)
+    if isinstance(v, collections.defaultdict):
+        return format_call(type(v).__name__,
+                           format_value(v.default_factory, exc, I, LB),
+                           formatted)
+    return format_call(type(v).__name__, formatted)
+
+def format_range(v: range) -> str:
+    """Format a `range` value.
+    
+    """
+    if v.step == 1:
+        return format_call("range", format_num(v.start), format_num(v.stop))
+    return format_call("range", format_num(v.start), format_num(v.stop),
+                       format_num(v.step))
+
+def format_iterator(v: typing.Iterator) -> str:
+    """Format an iterator or generator value as `<type>(...)` without
+    consuming any of its items.
+    
+    """
+    return format_call(type(v).__name__, models.settings.csh.f_operator("..."))
+
+
+def format_placeholder(v) -> str:
+    """Format `v` as `<type>(...)` without calling any of its methods.
+    
+    """
+    if isinstance(v, types.pstr):
+        return v._prepr._build_collapsed()
+    return format_call(type(v).__name__, models.settings.csh.f_operator("..."))
+
 
 def format_prepr(v: types.prepr, exc: typing.Dict[int, str], i: str,
                  lb: str) -> str:
@@ -160,6 +554,50 @@ def format_prepr(v: types.prepr, exc: typing.Dict[int, str], i: str,
     return v._build_simple(exc, I, LB)
 
 
+def format_index_path(key) -> str:
+    """Format a `[key]` path segment.
+    
+    """
+    return concat(
+        models.settings.csh.f_bracket("["),
+        format_value(key, {}, "", ""),
+        models.settings.csh.f_bracket("]"))
+
+
+def format_attr_path(name: str) -> str:
+    """Format a `.name` path segment.
+    
+    """
+    return concat(
+        models.settings.csh.f_operator("."),
+        models.settings.csh.f_attribute(name))
+
+
+def resolve_prepr(v) -> typing.Optional[types.prepr]:
+    """Return the `prepr` instance backing `v` (either a `pstr` or an object
+    whose `__repr__`/`__str__` accepts `return_prepr`), or None. Neither
+    method is called if `v` may not be stringified (see `may_stringify`),
+    and `__str__` is not called if the deadline passes while calling
+    `__repr__`.
+    
+    """
+    if isinstance(v, types.pstr):
+        return v._prepr
+    if not may_stringify(v):
+        return None
+    for method in ("__repr__", "__str__"):
+        if deadline_passed():
+            return None
+        if hasattr(v, method):
+            try:
+                _prepr = getattr(v, method)(return_prepr=True)
+            except Exception:
+                _prepr = None
+            if isinstance(_prepr, types.prepr):
+                return _prepr
+    return None
+
+
 def format_value(v, exc: typing.Dict[int, str], i: str, lb: str) -> str:
     """Format a given text value with the global colorspace depending on its
     type.
@@ -172,12 +610,25 @@ def format_value(v, exc: typing.Dict[int, str], i: str, lb: str) -> str:
         return format_num(v)
     if TYPE == bool or v is None:
         return format_bool_none(v)
+    if (deadline_passed() and not inspect.isclass(v) and
+            not isinstance(v, enum.Enum)):
+        return format_placeholder(v)
     if TYPE == list:
         return format_list(v, exc, i, lb)
     if TYPE == tuple:
         return format_tuple(v, exc, i, lb)
     if TYPE == dict:
         return format_dict(v, exc, i, lb)
+    if TYPE in [set, frozenset]:
+        return format_set(v, exc, i, lb)
+    if TYPE == collections.deque:
+        return format_deque(v, exc, i, lb)
+    if TYPE in DICT_VIEW_TYPES:
+        return format_dict_view(v, exc, i, lb)
+    if TYPE in [collections.OrderedDict, collections.defaultdict]:
+        return format_mapping(v, exc, i, lb)
+    if TYPE == range:
+        return format_range(v)
     if inspect.isclass(v):
         return format_class(v)
     if TYPE in [builtin_types.FunctionType, builtin_types.BuiltinFunctionType,
@@ -185,20 +636,14 @@ def format_value(v, exc: typing.Dict[int, str], i: str, lb: str) -> str:
         return format_func(v, lb)
     if isinstance(v, enum.Enum):
         return format_enum(v)
-    if isinstance(v, types.pstr):
-        return format_prepr(v._prepr, exc, i, lb)
-    if hasattr(v, "__repr__"):
-        try:
-            _prepr = v.__repr__(return_prepr=True)
-        except Exception:
-            _prepr = None
-        if isinstance(_prepr, types.prepr):
-            return format_prepr(_prepr, exc, i, lb)
-    if hasattr(v, "__str__"):
-        try:
-            _prepr = v.__str__(return_prepr=True)
-        except Exception:
-            _prepr = None
-        if isinstance(_prepr, types.prepr):
-            return format_prepr(_prepr, exc, i, lb)
+    if not isinstance(v, types.pstr) and not may_stringify(v):
+        return format_placeholder(v)
+    _prepr = resolve_prepr(v)
+    if _prepr is not None:
+        return format_prepr(_prepr, exc, i, lb)
+    if deadline_passed():
+        return format_placeholder(v)
+    if isinstance(v, ITERATOR_TYPES) or (TYPE.__module__ == "builtins" and
+                                         isinstance(v, typing.Iterator)):
+        return format_iterator(v)
     return models.settings.csh.f_other(attempt_str(v))
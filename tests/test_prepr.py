@@ -0,0 +1,368 @@
+import sys
+sys.path.append(".")
+from src import prepr
+import pytest
+
+
+class Example:
+    def __init__(self, a, b = None, c = None) -> None:
+        self.a = a
+        self.b = b
+        self.c = c
+        self.e = None
+    def __repr__(self, *args, **kwargs) -> prepr.pstr:
+        return prepr.prepr(self).arg(self.a).kwarg("b", self.b, None).kwarg(
+            "c", self.c, None).attr("e", self.e, None).build(*args, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def plain_settings():
+    prepr.settings.default()
+    prepr.settings.csh = prepr.CSHandler(prepr.Colorspace.none)
+    yield
+    prepr.settings.default()
+    prepr.settings.csh = prepr.CSHandler(prepr.Colorspace.rgbfull)
+
+
+def test_diff_reports_changed_paths_only():
+    old = Example([1, 2, 3], b={"x": 1})
+    new = Example([1, 5, 3], b={"x": 1, "y": 2})
+    assert prepr.diff(old, new).splitlines() == [
+        "- __example__[0][1] = 2",
+        "+ __example__[0][1] = 5",
+        "+ __example__.b[\"y\"] = 2",
+    ]
+
+
+def test_diff_identical_and_cyclic():
+    inst = Example(1)
+    inst.e = Example([inst])
+    assert prepr.diff(inst, inst) == ""
+    before = repr(inst)
+    inst.c = "C"
+    assert prepr.diff(before, inst).splitlines() == [
+        "+ __example__.c = \"C\""]
+
+
+def test_diff_plain_values():
+    assert prepr.diff([1, 2, 3], [1, 2]) == "- __list__[2] = 3"
+
+
+def test_bounded_formatters():
+    import collections
+    prepr.settings.minimal()
+    prepr.settings.max_items = 2
+    assert repr(Example({1, 2, 3})) == "__example__=Example(" \
+        "{1,2,...(1 more)})"
+    assert repr(Example(collections.deque([1], maxlen=3))) == \
+        "__example__=Example(deque([1],maxlen=3))"
+    assert repr(Example({"a": 1}.keys())) == \
+        "__example__=Example(dict_keys([\"a\"]))"
+    assert repr(Example(collections.defaultdict(list))) == \
+        "__example__=Example(defaultdict(list,{}))"
+    assert repr(Example(range(0, 10, 2))) == \
+        "__example__=Example(range(0,10,2))"
+
+
+def test_iterators_are_not_consumed():
+    generator = (n for n in range(3))
+    assert "generator(...)" in repr(Example(generator))
+    assert list(generator) == [0, 1, 2]
+
+
+def test_negative_max_items():
+    prepr.settings.minimal()
+    prepr.settings.max_items = -1
+    assert repr(Example({1, 2})) == "__example__=Example({...(2 more)})"
+
+
+def test_compress_runs():
+    prepr.settings.minimal()
+    prepr.settings.compress_runs = 3
+    assert repr(Example([0] * 5)) == "__example__=Example([0] * 5)"
+    assert repr(Example((0,) * 5)) == "__example__=Example((0,) * 5)"
+    assert repr(Example([1, 0, 0, 0, 2, 2])) == \
+        "__example__=Example([1,*[0] * 3,2,2])"
+    assert repr(Example([Example(1)] * 2 + [Example(1)])) == \
+        "__example__=Example([Example(1)] * 3)"
+
+
+def test_compress_runs_is_lossless():
+    import decimal
+    prepr.settings.minimal()
+    prepr.settings.compress_runs = 3
+    assert repr(Example([0.0, -0.0])) == "__example__=Example([0.0,-0.0])"
+    assert repr(Example([0.0, -0.0, 0.0])) == \
+        "__example__=Example([0.0,-0.0,0.0])"
+    assert repr(Example([decimal.Decimal("1.0"), decimal.Decimal("1.00")])) \
+        == "__example__=Example([1.0,1.00])"
+    assert repr(Example([Example(1), Example(1.0), Example(1)])) == \
+        "__example__=Example([Example(1),Example(1.0),Example(1)])"
+
+
+def test_print_single_write():
+    import io
+    class Stream(io.StringIO):
+        writes = 0
+        def write(self, text):
+            Stream.writes += 1
+            return super().write(text)
+    stream = Stream()
+    prepr.settings.csh = prepr.CSHandler(prepr.Colorspace.rgbfull)
+    prepr.print(Example(1), "x", 2, sep="|", file=stream)
+    assert stream.getvalue() == "__example__ = Example(    \n    1    \n)|x|2\n"
+    assert Stream.writes == 1
+    assert prepr.settings.csh.cs is prepr.Colorspace.rgbfull
+
+
+def test_print_keeps_built_pstr():
+    import io
+    class Described(Example):
+        def __str__(self):
+            return "described"
+    prepr.settings.csh = prepr.CSHandler(prepr.Colorspace.rgb8)
+    inst = Described(1)
+    stream = io.StringIO()
+    prepr.print(repr(inst), inst.__repr__(simple=True), file=stream)
+    assert stream.getvalue() == \
+        "__described__ = Described(    \n    1    \n) Described(    \n" \
+        "    1    \n)\n"
+
+
+def test_detect_colorspace(monkeypatch):
+    import io
+    class Terminal(io.StringIO):
+        def isatty(self):
+            return True
+    monkeypatch.delenv("NO_COLOR", raising=False)
+    monkeypatch.setenv("COLORTERM", "truecolor")
+    assert prepr.printer.detect_colorspace(Terminal()) is \
+        prepr.Colorspace.rgbfull
+    assert prepr.printer.detect_colorspace(io.StringIO()) is \
+        prepr.Colorspace.none
+    monkeypatch.setenv("NO_COLOR", "1")
+    assert prepr.printer.detect_colorspace(Terminal()) is \
+        prepr.Colorspace.none
+
+
+def test_render_path():
+    prepr.settings.minimal()
+    inst = Example(1, b={"k": [1, 2, 3]})
+    inst.e = Example([inst])
+    assert prepr.render_path(inst, "b['k'][2]") == \
+        "__example__.b[\"k\"][2]=3"
+    assert prepr.render_path(inst, "e[0][0]") == \
+        "__example__.e[0][0]=Example(1,b={\"k\":[1,2,3]})"
+    assert prepr.render_paths(inst, "[0]", "e").splitlines() == [
+        "__example__[0]=1",
+        "__example__.e=Example([__example__])"]
+
+
+def test_render_path_errors():
+    inst = Example([1])
+    with pytest.raises(IndexError):
+        prepr.render_path(inst, "[0][5]")
+    with pytest.raises(KeyError):
+        prepr.render_path(inst, "missing")
+    with pytest.raises(ValueError):
+        prepr.render_path(inst, "a..b")
+
+
+def test_fingerprint():
+    def make(value):
+        inst = Example(1, b=[value, {1, 2}])
+        inst.e = Example([inst])
+        return inst
+    assert prepr.fingerprint(make(1)) == prepr.fingerprint(make(1))
+    assert prepr.fingerprint(make(1)) != prepr.fingerprint(make(2))
+    assert prepr.fingerprint(make(1)) == prepr.fingerprint(repr(make(1)))
+    before = prepr.fingerprint(make(1))
+    prepr.settings.csh = prepr.CSHandler(prepr.Colorspace.rgb8)
+    prepr.settings.minimal()
+    assert prepr.fingerprint(make(1)) == before
+    assert prepr.fingerprint([1]) != prepr.fingerprint((1,))
+    assert prepr.fingerprint({1: 2}) != prepr.fingerprint({2: 1})
+
+
+def test_tabulate():
+    prepr.settings.tabulate = 2
+    inst = Example([Example(1, b="x"), Example(22, c=[1])])
+    assert repr(inst) == "\n".join([
+        "__example__ = Example(    ",
+        "    [",
+        "        Example | [0] | b   | c",
+        "        --------+-----+-----+----",
+        "        0       | 1   | \"x\" |",
+        "        1       | 22  |     | [1]",
+        "    ]    ",
+        ")"])
+
+
+def test_tabulate_fallbacks():
+    prepr.settings.tabulate = 0
+    assert repr(Example([])) == repr(Example([], b=None))
+    assert "PreprBuildFailure" not in repr(Example([]))
+    prepr.settings.tabulate = 2
+    mixed = repr(Example([Example(1), 2]))
+    multiline = repr(Example([Example("a\nb"), Example(1)]))
+    prepr.settings.tabulate = None
+    assert mixed == repr(Example([Example(1), 2]))
+    assert multiline == repr(Example([Example("a\nb"), Example(1)]))
+
+
+class Slow:
+    calls = 0
+    def __init__(self, delay) -> None:
+        self.delay = delay
+    def __repr__(self, *args, **kwargs) -> str:
+        import time
+        Slow.calls += 1
+        time.sleep(self.delay)
+        return "slow"
+
+
+def test_time_budget_bounds_foreign_calls():
+    import time
+    prepr.settings.minimal()
+    prepr.settings.time_budget = 0.08
+    Slow.calls = 0
+    start = time.perf_counter()
+    text = repr(Example([Slow(0.05), Slow(0.05), [1]], b=Example(1)))
+    elapsed = time.perf_counter() - start
+    assert text == "__example__=Example([slow,Slow(...),list(...)]," \
+        "b=Example(...))"
+    assert Slow.calls == 2
+    assert elapsed < 0.08 + 0.05 + 0.04
+
+
+def test_time_budget_is_per_thread():
+    import threading
+    prepr.settings.minimal()
+    prepr.settings.time_budget = 0.01
+    results = []
+    def slow_build():
+        results.append(repr(Example([Slow(0.05), Slow(0.05)])))
+    thread = threading.Thread(target=slow_build)
+    thread.start()
+    prepr.settings.time_budget = None
+    import time
+    time.sleep(0.02)
+    assert repr(Example([1, 2], b=(3,))) == "__example__=Example([1,2]," \
+        "b=(3,))"
+    thread.join()
+    assert results == ["__example__=Example([Slow(...),Slow(...)])"]
+
+
+def test_str_denylist_and_allowlist():
+    prepr.settings.minimal()
+    prepr.settings.str_denylist = (Slow,)
+    Slow.calls = 0
+    prepr.settings.tabulate = 1
+    prepr.settings.compress_runs = 2
+    lazy = Slow(0)
+    assert repr(Example([lazy, lazy, 1])) == \
+        "__example__=Example([*[Slow(...)] * 2,1])"
+    prepr.diff([lazy], [Slow(0)])
+    prepr.fingerprint(lazy)
+    with pytest.raises(AttributeError):
+        prepr.render_path(Example(lazy), "[0].delay.real.x")
+    assert Slow.calls == 0
+    prepr.settings.str_denylist = ()
+    prepr.settings.str_allowlist = (Example,)
+    assert repr(Example(Slow(0))) == "__example__=Example(Slow(...))"
+    assert Slow.calls == 0
+
+
+def test_diff_deepcopy_snapshot():
+    import copy
+    inst = Example(1)
+    inst.e = Example([inst])
+    before = copy.deepcopy(inst)
+    inst.e.c = "X"
+    inst.e.a.append(2)
+    assert prepr.diff(before, inst).splitlines() == [
+        "+ __example__.e[0][1] = 2",
+        "+ __example__.e.c = \"X\""]
+
+
+def test_compress_runs_keeps_cycle_labels():
+    class Node:
+        def __init__(self) -> None:
+            self.peers = []
+        def __repr__(self, *args, **kwargs) -> prepr.pstr:
+            return prepr.prepr(self).arg(self.peers).build(*args, **kwargs)
+    prepr.settings.minimal()
+    prepr.settings.compress_runs = 2
+    a, twin = Node(), Node()
+    a.peers = [a, twin]
+    twin.peers = [a, a]
+    assert repr(a) == "__node__=Node([__node__,Node([__node__] * 2)])"
+    prepr.settings.compress_runs = 3
+    assert repr(a) == "__node__=Node([__node__,Node([__node__,__node__])])"
+
+
+def test_compress_runs_formats_each_item_once():
+    class Foreign:
+        calls = 0
+        def __init__(self, n) -> None:
+            self.n = n
+        def __str__(self) -> str:
+            Foreign.calls += 1
+            return "f" + str(self.n)
+    prepr.settings.minimal()
+    prepr.settings.compress_runs = 2
+    items = [Foreign(n) for n in range(100)]
+    Foreign.calls = 0
+    repr(Example(items))
+    assert Foreign.calls == 100
+    Foreign.calls = 0
+    assert repr(Example([items[0]] * 50)) == "__example__=Example([f0] * 50)"
+    assert Foreign.calls == 1
+
+
+def test_compress_runs_homogeneous_layout():
+    prepr.settings.compress_runs = 3
+    assert repr(Example([1, 2, 2, 2, 3])) == \
+        "__example__ = Example(    \n    [1, *[2] * 3, 3]    \n)"
+
+
+def test_print_colorspace_is_per_thread():
+    import io
+    import threading
+    started = threading.Event()
+    release = threading.Event()
+    class Blocking:
+        def __str__(self) -> str:
+            started.set()
+            release.wait(5)
+            return "blocking"
+    prepr.settings.csh = prepr.CSHandler(prepr.Colorspace.rgb8)
+    stream = io.StringIO()
+    thread = threading.Thread(
+        target=lambda: prepr.print(Example(Blocking()), file=stream))
+    thread.start()
+    started.wait(5)
+    assert "\033[" in repr(Example(1))
+    release.set()
+    thread.join()
+    assert "\033[" not in stream.getvalue()
+
+
+def test_print_none_sep_and_end():
+    import io
+    stream = io.StringIO()
+    prepr.print(1, 2, sep=None, end=None, file=stream)
+    assert stream.getvalue() == "1 2\n"
+
+
+def test_fingerprint_notes_and_denylist():
+    class Noted:
+        def __init__(self, note) -> None:
+            self.note = note
+        def __repr__(self, *args, **kwargs) -> prepr.pstr:
+            return prepr.prepr(self, note=self.note).build(*args, **kwargs)
+    assert prepr.fingerprint(Noted("a")) != prepr.fingerprint(Noted("b"))
+    assert prepr.fingerprint(Noted("a")) == prepr.fingerprint(Noted("a"))
+    before = prepr.fingerprint([Slow(0)])
+    prepr.settings.str_denylist = (Slow,)
+    assert prepr.fingerprint([Slow(0)]) != before